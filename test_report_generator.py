@@ -8,11 +8,167 @@ import json
 import os
 import argparse
 import shutil
+import gzip
+import math
+import re
+import sys
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Iterable, NamedTuple, Tuple, Union
 import base64
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# File suffix appended to the report name for each supported compression format
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+    'br': '.br',
+}
+
+
+# Result columns whose values repeat heavily across rows (command args and raw
+# responses). They are interned at load time and rendered once per distinct value.
+INTERNED_COLUMNS = (
+    'socan_command_args',
+    'rf_matrix_command_args',
+    'keysight_xsan_command_args',
+    'raw_socan_response',
+)
+
+# Long values shorter than this are inlined in every row rather than shared
+SHARED_VALUE_MIN_LENGTH = 100
+
+
+def available_compressions() -> List[str]:
+    """Return the compression formats usable in this environment"""
+    formats = ['gzip']
+    if zstandard is not None:
+        formats.append('zstd')
+    if brotli is not None:
+        formats.append('br')
+    return formats
+
+
+class ReportWriter:
+    """Text writer that streams output to a plain file and/or compressed siblings
+
+    Each chunk passed to write() is encoded once and fed to every open sink, so
+    the compressed files are produced while the report is rendered instead of
+    in a second pass over the finished HTML. Output goes to temporary siblings
+    that only replace the real files once close() succeeds, so a failed render
+    never leaves a truncated report behind.
+    """
+
+    def __init__(self, output_file: Path, compression: Optional[List[str]] = None,
+                 compress_only: bool = False):
+        self.output_file = output_file
+        self.paths = []
+        self._temp_paths = []
+        self._files = []
+        self._sinks = []
+        self._brotli_sinks = []
+
+        try:
+            if not compress_only or not compression:
+                self._sinks.append(self._open_temp(output_file))
+
+            for fmt in compression or []:
+                path = output_file.with_name(output_file.name + COMPRESSION_SUFFIXES[fmt])
+                raw_file = self._open_temp(path)
+                if fmt == 'gzip':
+                    self._sinks.append(gzip.GzipFile(filename=path.name, mode='wb', fileobj=raw_file))
+                elif fmt == 'zstd':
+                    self._sinks.append(zstandard.ZstdCompressor().stream_writer(raw_file))
+                elif fmt == 'br':
+                    self._brotli_sinks.append((brotli.Compressor(), raw_file))
+        except BaseException:
+            self.abort()
+            raise
+
+    def _open_temp(self, path: Path):
+        """Open a temporary sibling of path that close() moves into place"""
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        raw_file = open(temp_path, 'wb')
+        self.paths.append(path)
+        self._temp_paths.append(temp_path)
+        self._files.append(raw_file)
+        return raw_file
+
+    def write(self, text: str) -> None:
+        data = text.encode('utf-8')
+        for sink in self._sinks:
+            sink.write(data)
+        for compressor, sink in self._brotli_sinks:
+            sink.write(compressor.process(data))
+
+    def close(self) -> None:
+        """Finish all sinks and move the completed files into place"""
+        try:
+            for sink in self._sinks:
+                sink.close()
+            for compressor, sink in self._brotli_sinks:
+                sink.write(compressor.finish())
+            for raw_file in self._files:
+                raw_file.close()
+        except BaseException:
+            self.abort()
+            raise
+
+        for temp_path, path in zip(self._temp_paths, self.paths):
+            os.replace(temp_path, path)
+        self._reset()
+
+    def abort(self) -> None:
+        """Close all sinks and delete the temporary files, leaving existing reports untouched"""
+        for sink in self._sinks + self._files:
+            try:
+                sink.close()
+            except Exception:
+                pass
+        for temp_path in self._temp_paths:
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+        self._reset()
+
+    def _reset(self) -> None:
+        self._temp_paths = []
+        self._files = []
+        self._sinks = []
+        self._brotli_sinks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
 
 class TestResultParser:
     """Parser for test result files"""
@@ -29,7 +185,8 @@ class TestResultParser:
             'results_data': [],
             'params': {},
             'status': {},
-            'screenshots': []
+            'screenshots': [],
+            'warnings': []
         }
         
         # Parse results JSON
@@ -39,8 +196,9 @@ class TestResultParser:
                 with open(results_file, 'r') as f:
                     results['results_data'] = json.load(f)
             except json.JSONDecodeError as e:
-                print(f"Warning: Invalid JSON in {results_file.name}: {str(e)}")
+                results['warnings'].append(f"Invalid JSON in {results_file.name}: {str(e)}")
                 results['results_data'] = []
+            self._intern_columns(results['results_data'])
         
         # Parse params JSON  
         params_file = self._find_file_with_suffix('_params.json')
@@ -49,7 +207,7 @@ class TestResultParser:
                 with open(params_file, 'r') as f:
                     results['params'] = json.load(f)
             except json.JSONDecodeError as e:
-                print(f"Warning: Invalid JSON in {params_file.name}: {str(e)}")
+                results['warnings'].append(f"Invalid JSON in {params_file.name}: {str(e)}")
                 results['params'] = {}
                 
         # Parse status JSON
@@ -59,7 +217,7 @@ class TestResultParser:
                 with open(status_file, 'r') as f:
                     results['status'] = json.load(f)
             except json.JSONDecodeError as e:
-                print(f"Warning: Invalid JSON in {status_file.name}: {str(e)}")
+                results['warnings'].append(f"Invalid JSON in {status_file.name}: {str(e)}")
                 results['status'] = {}
                 
         # Find screenshots
@@ -68,6 +226,15 @@ class TestResultParser:
             
         return results
     
+    @staticmethod
+    def _intern_columns(results_data: List[Dict]) -> None:
+        """Intern repeated string values so identical cells share one object"""
+        for entry in results_data:
+            for key in INTERNED_COLUMNS:
+                value = entry.get(key)
+                if isinstance(value, str):
+                    entry[key] = sys.intern(value)
+    
     def _find_file_with_suffix(self, suffix: str) -> Optional[Path]:
         """Find file with specific suffix in test folder"""
         for file in self.test_folder.glob(f'*{suffix}'):
@@ -78,18 +245,38 @@ class TestResultParser:
 class HTMLReportGenerator:
     """Generator for HTML test reports"""
     
-    def __init__(self):
+    def __init__(self, compression: Optional[List[str]] = None, compress_only: bool = False):
         self.html_template = self._create_html_template()
+        self.compression = compression
+        self.compress_only = compress_only
+    
+    def generate_report(self, test_results: Dict[str, Any], output_file: Path) -> List[Path]:
+        """Generate HTML report for a single test and return the files written"""
+        
+        # Write HTML file (plain and/or compressed) chunk by chunk as it is rendered
+        with ReportWriter(output_file, self.compression, self.compress_only) as writer:
+            for chunk in self.render_chunks(test_results):
+                writer.write(chunk)
+        
+        return writer.paths
     
-    def generate_report(self, test_results: Dict[str, Any], output_file: Path) -> None:
-        """Generate HTML report for a single test"""
+    def render_html(self, test_results: Dict[str, Any]) -> str:
+        """Render the HTML report for a single test"""
+        return ''.join(self.render_chunks(test_results))
+    
+    def render_chunks(self, test_results: Dict[str, Any]) -> Iterator[str]:
+        """Render the HTML report for a single test as a sequence of chunks
+        
+        The table rows and screenshots are yielded one at a time, so the whole
+        page never has to be held in memory at once.
+        """
+        head, rest = self.html_template.split('{table_rows}', 1)
+        middle, tail = rest.split('{screenshot_html}', 1)
         
         # Process results data for table
         table_headers = self._generate_table_headers(test_results['results_data'])
-        table_rows = self._generate_table_rows(test_results['results_data'])
-        
-        # Process screenshots
-        screenshot_html = self._generate_screenshot_html(test_results['screenshots'])
+        shared_refs = self._collect_shared_values(test_results['results_data'])
+        nested_refs = {}
         
         # Generate status info
         status_info = self._generate_status_info(test_results['status'])
@@ -97,22 +284,25 @@ class HTMLReportGenerator:
         # Generate params info
         params_info = self._generate_params_info(test_results['params'])
         
-        # Fill in the template
-        html_content = self.html_template.format(
+        # Fill in the template around the streamed sections
+        yield head.format(
             test_name=test_results['test_name'],
             status_info=status_info,
             params_info=params_info,
-            table_headers=table_headers,
-            table_rows=table_rows,
-            screenshot_html=screenshot_html,
-            generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            table_headers=table_headers
         )
+        yield from self._iter_table_rows(test_results['results_data'], shared_refs, nested_refs)
+        yield middle.format()
         
-        # Write HTML file
-        with open(output_file, 'w') as f:
-            f.write(html_content)
-            
-        print(f"Generated report: {output_file}")
+        # Process screenshots
+        yield from self._iter_screenshot_html(test_results['screenshots'])
+        
+        # The lookups are complete once every row has been rendered
+        yield tail.format(
+            shared_values=json.dumps(list(shared_refs)).replace('</', '<\\/'),
+            nested_values=('[' + ','.join(nested_refs) + ']').replace('</', '<\\/'),
+            generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
     
     def _get_all_unique_keys(self, results_data: List[Dict]) -> List[str]:
         """Get all unique keys from the results data in a consistent order"""
@@ -253,73 +443,143 @@ class HTMLReportGenerator:
         
         return str(value)
 
-    def _generate_table_rows(self, results_data: List[Dict]) -> str:
-        """Generate HTML table rows from results data"""
+    def _collect_shared_values(self, results_data: List[Dict]) -> Dict[str, int]:
+        """Assign a lookup index to long values that repeat across rows of the interned columns"""
+        counts = {}
+        for entry in results_data:
+            for key in INTERNED_COLUMNS:
+                value = entry.get(key)
+                if isinstance(value, str) and len(value) > SHARED_VALUE_MIN_LENGTH:
+                    counts[value] = counts.get(value, 0) + 1
+        
+        shared_refs = {}
+        for value, count in counts.items():
+            if count > 1:
+                shared_refs[value] = len(shared_refs)
+        return shared_refs
+    
+    def _get_cell_class(self, key: str) -> str:
+        """Get the CSS class for a column based on its content type"""
+        if 'command' in key.lower():
+            return 'command'
+        elif 'parsed' in key.lower() and 'response' in key.lower():
+            return 'parsed-response'
+        elif 'response' in key.lower():
+            return 'response'
+        elif any(word in key.lower() for word in ['frequency', 'amplitude', 'peak']):
+            return 'numeric'
+        return ''
+    
+    def _format_nested_value(self, key: str, value: Dict, nested_refs: Dict[str, int]) -> str:
+        """Format a dict value, deferring large ones to the page's nested value data
+        
+        Values whose compact JSON exceeds 100 characters are serialized once
+        (identical values share an entry) and shown as a collapsed cell that is
+        only turned into a tree in the browser when expanded. Smaller values are
+        shown inline as before.
+        """
+        try:
+            data = json.dumps(value, separators=(',', ':'), default=str, allow_nan=False)
+        except ValueError:
+            # NaN/Infinity are valid for Python's json module but not for JSON.parse
+            data = json.dumps(self._replace_non_finite(value), separators=(',', ':'), default=str)
+        if len(data) <= 100:
+            return self._format_cell_value(key, value)
+        
+        ref = nested_refs.get(data)
+        if ref is None:
+            ref = nested_refs[data] = len(nested_refs)
+        label = "key" if len(value) == 1 else "keys"
+        return f'<details class="json-cell" data-json="{ref}"><summary>{{{len(value)} {label}}}</summary></details>'
+    
+    @classmethod
+    def _replace_non_finite(cls, value: Any) -> Any:
+        """Replace NaN and infinite floats with their string form, recursively"""
+        if isinstance(value, float) and not math.isfinite(value):
+            return str(value)
+        if isinstance(value, dict):
+            return {key: cls._replace_non_finite(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._replace_non_finite(item) for item in value]
+        return value
+    
+    def _iter_table_rows(self, results_data: List[Dict], shared_refs: Optional[Dict[str, int]] = None,
+                         nested_refs: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        """Generate HTML table rows from results data, one row at a time
+        
+        Values of the interned columns are formatted once per distinct value.
+        Those listed in shared_refs are emitted as references into the page's
+        shared value lookup instead of being repeated in every row. Dict values
+        are added to nested_refs as compact JSON and rendered as collapsed cells.
+        """
         if not results_data:
-            return "<tr><td colspan='100%'>No test data available</td></tr>"
+            yield "<tr><td colspan='100%'>No test data available</td></tr>"
+            return
         
+        shared_refs = shared_refs or {}
+        if nested_refs is None:
+            nested_refs = {}
         all_keys = self._get_all_unique_keys(results_data)
-        rows = []
+        cell_openers = [
+            f"<td class='{css_class}'>" if css_class else "<td>"
+            for css_class in (self._get_cell_class(key) for key in all_keys)
+        ]
+        fragment_cache = {}
         
         for i, entry in enumerate(results_data):
-            row = f"<tr class='{'even' if i % 2 == 0 else 'odd'}'>"
+            row = ("\n" if i else "") + f"<tr class='{'even' if i % 2 == 0 else 'odd'}'>"
             
             # Row number
             row += f"<td>{i + 1}</td>"
             
             # Add data for each column
-            for key in all_keys:
+            for key, cell_opener in zip(all_keys, cell_openers):
                 value = entry.get(key, 'N/A')
-                formatted_value = self._format_cell_value(key, value)
-                
-                # Apply appropriate CSS class based on content type
-                css_class = ''
-                if 'command' in key.lower():
-                    css_class = 'command'
-                elif 'parsed' in key.lower() and 'response' in key.lower():
-                    css_class = 'parsed-response'
-                elif 'response' in key.lower():
-                    css_class = 'response'
-                elif any(word in key.lower() for word in ['frequency', 'amplitude', 'peak']):
-                    css_class = 'numeric'
-                
-                if css_class:
-                    row += f"<td class='{css_class}'>{formatted_value}</td>"
+                if key in INTERNED_COLUMNS and isinstance(value, str):
+                    formatted_value = fragment_cache.get(value)
+                    if formatted_value is None:
+                        if value in shared_refs:
+                            formatted_value = f'<div class="cell-content" data-ref="{shared_refs[value]}"></div>'
+                        else:
+                            formatted_value = self._format_cell_value(key, value)
+                        fragment_cache[value] = formatted_value
+                elif isinstance(value, dict) and value:
+                    formatted_value = self._format_nested_value(key, value, nested_refs)
                 else:
-                    row += f"<td>{formatted_value}</td>"
+                    formatted_value = self._format_cell_value(key, value)
+                
+                row += f"{cell_opener}{formatted_value}</td>"
             
             row += "</tr>"
-            rows.append(row)
-        
-        return '\n'.join(rows)
+            yield row
     
-    def _generate_screenshot_html(self, screenshots: List[str]) -> str:
-        """Generate HTML for screenshots section"""
+    def _iter_screenshot_html(self, screenshots: List[str]) -> Iterator[str]:
+        """Generate HTML for screenshots section, one screenshot at a time"""
         if not screenshots:
-            return "<p>No screenshots available</p>"
+            yield "<p>No screenshots available</p>"
+            return
             
-        html = "<div class='screenshots'>\n"
+        yield "<div class='screenshots'>\n"
         for screenshot_path in screenshots:
             screenshot_name = Path(screenshot_path).name
             try:
                 # Encode image as base64 for embedding
                 with open(screenshot_path, 'rb') as f:
                     img_data = base64.b64encode(f.read()).decode('utf-8')
-                html += f"""
+                yield f"""
                 <div class='screenshot' id='{screenshot_name}'>
                     <h4>{screenshot_name}</h4>
                     <img src='data:image/png;base64,{img_data}' alt='{screenshot_name}' />
                 </div>
                 """
             except Exception as e:
-                html += f"""
+                yield f"""
                 <div class='screenshot' id='{screenshot_name}'>
                     <h4>{screenshot_name}</h4>
                     <p>Error loading image: {str(e)}</p>
                 </div>
                 """
-        html += "</div>\n"
-        return html
+        yield "</div>\n"
     
     def _generate_status_info(self, status: Dict) -> str:
         """Generate status information HTML"""
@@ -529,6 +789,23 @@ class HTMLReportGenerator:
             white-space: nowrap;
         }}
         
+        /* Collapsible nested values, built on first expand */
+        .json-cell summary {{
+            cursor: pointer;
+            color: #3498db;
+        }}
+        
+        .json-tree {{
+            margin: 0;
+            padding-left: 12px;
+            list-style: none;
+            white-space: pre-wrap;
+        }}
+        
+        .json-key {{
+            font-weight: bold;
+        }}
+        
         tr:nth-child(even) {{
             background-color: #f8f9fa;
         }}
@@ -600,128 +877,451 @@ class HTMLReportGenerator:
             <p>Report generated on {generation_time}</p>
         </div>
     </div>
+    <script type="application/json" id="shared-values">{shared_values}</script>
+    <script type="application/json" id="nested-values">{nested_values}</script>
+    <script>
+        // Fill in long values shared by several rows from the lookup table
+        (function() {{
+            var shared = JSON.parse(document.getElementById('shared-values').textContent);
+            document.querySelectorAll('[data-ref]').forEach(function(cell) {{
+                cell.innerHTML = shared[cell.getAttribute('data-ref')];
+            }});
+        }})();
+        
+        // Build the tree for a nested value the first time its cell is expanded
+        (function() {{
+            var nested = null;
+            
+            function buildTree(value) {{
+                var list = document.createElement('ul');
+                list.className = 'json-tree';
+                Object.keys(value).forEach(function(key) {{
+                    var item = document.createElement('li');
+                    var child = value[key];
+                    var label = document.createElement('span');
+                    label.className = 'json-key';
+                    label.textContent = key + ': ';
+                    if (child !== null && typeof child === 'object') {{
+                        var details = document.createElement('details');
+                        var summary = document.createElement('summary');
+                        summary.appendChild(label);
+                        summary.appendChild(document.createTextNode(Array.isArray(child) ? '[' + child.length + (child.length === 1 ? ' item]' : ' items]') : '{{' + Object.keys(child).length + (Object.keys(child).length === 1 ? ' key}}' : ' keys}}')));
+                        details.appendChild(summary);
+                        details.appendChild(buildTree(child));
+                        item.appendChild(details);
+                    }} else {{
+                        item.appendChild(label);
+                        item.appendChild(document.createTextNode(JSON.stringify(child)));
+                    }}
+                    list.appendChild(item);
+                }});
+                return list;
+            }}
+            
+            document.addEventListener('toggle', function(event) {{
+                var cell = event.target;
+                if (!cell.open || !cell.hasAttribute('data-json') || cell.dataset.built) {{
+                    return;
+                }}
+                if (nested === null) {{
+                    nested = JSON.parse(document.getElementById('nested-values').textContent);
+                }}
+                cell.appendChild(buildTree(nested[cell.getAttribute('data-json')]));
+                cell.dataset.built = '1';
+            }}, true);
+        }})();
+    </script>
 </body>
 </html>"""
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Generate HTML reports from RS ATS test results',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  # Generate reports for a specific test results folder
-  python test_report_generator.py /path/to/output/setups_180925_091733
-  
-  # Generate reports with custom output directory
-  python test_report_generator.py /path/to/output/setups_180925_091733 --output-dir ./reports
-        """
-    )
-    
-    parser.add_argument(
-        'input_dir',
-        type=Path,
-        nargs='?',
-        default=Path('output'),
-        help='Input directory containing test result folders (default: output)'
-    )
-    
-    parser.add_argument(
-        '--output-dir', '-o',
-        type=Path,
-        default='processed_results',
-        required=False,
-        help='Output directory for HTML reports (default: same as input)'
-    )
-    
-    args = parser.parse_args()
-    
-    input_dir = args.input_dir.resolve()
-    if not input_dir.exists():
-        print(f"Error: Input directory {input_dir} does not exist")
-        return 1
-    
-    # Set output directory
-    if args.output_dir:
-        output_dir = args.output_dir.resolve()
-        output_dir.mkdir(parents=True, exist_ok=True)
-    else:
-        output_dir = input_dir
-    
-    # Recursively find all subfolders containing *_results.json files
+def find_result_folders(input_dir: Path) -> List[Path]:
+    """Recursively find all subfolders containing *_results.json files"""
     valid_folders = []
     for root, dirs, files in os.walk(input_dir):
-        folder_path = Path(root)
         if any(f.endswith('_results.json') for f in files):
-            valid_folders.append(folder_path)
+            valid_folders.append(Path(root))
+    return sorted(valid_folders)
 
-    if not valid_folders:
-        print(f"No result folders found in {input_dir}")
-        return 1
 
-    print(f"Found {len(valid_folders)} result folders")
+# Parsed results of one test folder, as returned by TestResultParser.parse_results()
+TestResults = Dict[str, Any]
 
-    # Generate reports for each result folder
-    report_generator = HTMLReportGenerator()
-    generated_reports = []
 
-    for result_folder in sorted(valid_folders):
-        print(f"Processing {result_folder.name}...")
+class FolderManifest(NamedTuple):
+    """A result folder found by discover()"""
+    folder: Path
+    test_run_name: str  # Output subdirectory the report is grouped under
 
-        try:
-            # Parse test results
-            parser = TestResultParser(result_folder)
-            test_results = parser.parse_results()
+    @property
+    def report_name(self) -> str:
+        return f"{self.folder.name}_report.html"
 
-            # Create output directory for this test run (parent folder name)
-            test_run_name = result_folder.parent.name if result_folder.parent != input_dir else result_folder.name
-            test_run_output_dir = output_dir / test_run_name
-            test_run_output_dir.mkdir(parents=True, exist_ok=True)
 
-            # Generate HTML report in the test run folder
-            output_file = test_run_output_dir / f"{result_folder.name}_report.html"
-            report_generator.generate_report(test_results, output_file)
-            generated_reports.append(output_file)
+class ReportResult(NamedTuple):
+    """Outcome of generating the report for one result folder"""
+    manifest: FolderManifest
+    output_file: Path
+    written_files: List[Path]
+    error: Optional[str] = None
+    status: Optional[Dict[str, Any]] = None  # Contents of the test's _status.json
+    warnings: Tuple[str, ...] = ()  # Problems found while parsing, e.g. invalid JSON files
 
-        except Exception as e:
-            print(f"Error processing {result_folder.name}: {str(e)}")
 
-    # Generate index page
-    index_file = output_dir / "index.html"
-    _generate_index_page(generated_reports, index_file, input_dir.name)
+def discover(input_dir: Path) -> Iterator[FolderManifest]:
+    """Yield a manifest for every result folder under input_dir"""
+    for folder in find_result_folders(input_dir):
+        # Group reports by test run (parent folder name)
+        test_run_name = folder.parent.name if folder.parent != input_dir else folder.name
+        yield FolderManifest(folder, test_run_name)
 
-    print(f"\nGenerated {len(generated_reports)} test reports in {output_dir}")
-    print(f"Open {index_file} to view all reports")
 
-    return 0
+def parse(manifest: FolderManifest) -> TestResults:
+    """Parse the result files of a single folder"""
+    return TestResultParser(manifest.folder).parse_results()
 
 
-def _generate_index_page(report_files: List[Path], index_file: Path, test_session: str):
-    """Generate an index page with links to all reports"""
-    
-    # Group reports by test run (parent folder)
-    test_runs = {}
-    for report_file in report_files:
-        test_run = report_file.parent.name
-        if test_run not in test_runs:
-            test_runs[test_run] = []
-        test_runs[test_run].append(report_file)
-    
-    index_html = f"""<!DOCTYPE html>
+def render(results: TestResults, sink: Union[str, os.PathLike, Any],
+           report_generator: Optional['HTMLReportGenerator'] = None) -> List[Path]:
+    """Render a report to a file path or any object with a write(str) method
+
+    The report is written chunk by chunk in both cases. Returns the files
+    written, which is empty when sink is a stream.
+    """
+    report_generator = report_generator or HTMLReportGenerator()
+    if isinstance(sink, (str, os.PathLike)):
+        return report_generator.generate_report(results, Path(sink))
+    for chunk in report_generator.render_chunks(results):
+        sink.write(chunk)
+    return []
+
+
+def process_folder(manifest: FolderManifest, output_dir: Path,
+                   report_generator: Optional['HTMLReportGenerator'] = None) -> ReportResult:
+    """Parse and render one folder, capturing any error in the result"""
+    output_file = output_dir / manifest.test_run_name / manifest.report_name
+    try:
+        results = parse(manifest)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        written_files = render(results, output_file, report_generator)
+    except Exception as e:
+        return ReportResult(manifest, output_file, [], str(e))
+    return ReportResult(manifest, output_file, written_files, status=results['status'],
+                        warnings=tuple(results['warnings']))
+
+
+def run_pipeline(manifests: Iterable[FolderManifest], output_dir: Path,
+                 report_generator: Optional['HTMLReportGenerator'] = None,
+                 executor: Optional[Executor] = None) -> Iterator[ReportResult]:
+    """Generate reports for the given manifests, yielding results in order
+
+    Folders are processed one at a time in the calling thread unless an
+    executor (thread or process pool) is given.
+    """
+    report_generator = report_generator or HTMLReportGenerator()
+    if executor is None:
+        for manifest in manifests:
+            yield process_folder(manifest, output_dir, report_generator)
+        return
+
+    manifests = list(manifests)
+    yield from executor.map(process_folder, manifests,
+                            [output_dir] * len(manifests),
+                            [report_generator] * len(manifests))
+
+
+def write_index(report_results: Iterable[ReportResult], output_dir: Path, test_session: str,
+                compression: Optional[List[str]] = None, compress_only: bool = False) -> Path:
+    """Write the index pages linking every successfully generated report
+
+    Returns the top-level index file that was written, which is the compressed
+    copy when only compressed output is kept.
+    """
+    return IndexGenerator(compression, compress_only).generate(report_results, output_dir, test_session)
+
+
+class SessionComparator:
+    """Compare the results of two test sessions
+
+    Tests are aligned by folder name and rows by (channel, frequency, gain).
+    Repeated keys within a test are told apart by their order of occurrence.
+    Rows with none of the key fields can only be paired by position; they are
+    flagged as such in the comparison.
+    """
+
+    # Row fields used to build the alignment key, with fallbacks for tests that
+    # record the same quantity under a different name
+    ROW_KEY_FIELDS = {
+        'channel': ['channel', 'matrix_channel', 'upconverter_device'],
+        'frequency': ['frequency', 'target_frequency_mhz', 'input_frequency_ghz'],
+        'gain': ['gain'],
+    }
+
+    # Per-channel columns (frequency_0, gain_0, enabled_0, ...) used when a row
+    # has none of the fields above
+    CHANNEL_COLUMN_PATTERN = re.compile(r'^(?:frequency|gain|enabled)_(\d+)$')
+
+    def __init__(self, session_a: Path, session_b: Path,
+                 amplitude_threshold: float = 1.0, frequency_threshold: float = 1e6,
+                 trace_threshold: float = 5.0):
+        self.session_a = session_a
+        self.session_b = session_b
+        self.amplitude_threshold = amplitude_threshold
+        self.frequency_threshold = frequency_threshold
+        self.trace_threshold = trace_threshold
+
+    def compare(self) -> Dict[str, Any]:
+        """Compare all tests present in both sessions"""
+        tests_a = {folder.name: folder for folder in find_result_folders(self.session_a)}
+        tests_b = {folder.name: folder for folder in find_result_folders(self.session_b)}
+
+        comparison = {
+            'session_a': self.session_a.name,
+            'session_b': self.session_b.name,
+            'amplitude_threshold': self.amplitude_threshold,
+            'frequency_threshold': self.frequency_threshold,
+            'trace_threshold': self.trace_threshold,
+            'tests': [],
+            'only_in_a': sorted(set(tests_a) - set(tests_b)),
+            'only_in_b': sorted(set(tests_b) - set(tests_a)),
+        }
+
+        for test_name in sorted(set(tests_a) & set(tests_b)):
+            results_a = TestResultParser(tests_a[test_name]).parse_results()
+            results_b = TestResultParser(tests_b[test_name]).parse_results()
+            comparison['tests'].append(self._compare_test(test_name, results_a, results_b))
+
+        return comparison
+
+    def _compare_test(self, test_name: str, results_a: Dict[str, Any],
+                      results_b: Dict[str, Any]) -> Dict[str, Any]:
+        """Compare the rows of a single test"""
+        rows_a = self._index_rows(results_a['results_data'])
+        rows_b = self._index_rows(results_b['results_data'])
+
+        rows = []
+        for key, row_a in rows_a.items():
+            row_b = rows_b.get(key)
+            if row_b is not None:
+                rows.append(self._compare_row(key, row_a, row_b))
+
+        status_a = results_a['status'].get('status', 'UNKNOWN')
+        status_b = results_b['status'].get('status', 'UNKNOWN')
+
+        return {
+            'test_name': test_name,
+            'status_a': status_a,
+            'status_b': status_b,
+            'status_regression': status_a == 'PASSED' and status_b != 'PASSED',
+            'warnings': results_a['warnings'] + results_b['warnings'],
+            'rows': rows,
+            'only_in_a': [self._format_key(key) for key in rows_a if key not in rows_b],
+            'only_in_b': [self._format_key(key) for key in rows_b if key not in rows_a],
+            'regressions': sum(1 for row in rows if row['regression']),
+            'positional_matches': sum(1 for row in rows if row['by_position']),
+        }
+
+    def _index_rows(self, results_data: List[Dict]) -> Dict[tuple, Dict]:
+        """Map each row to its (channel, frequency, gain, occurrence) key"""
+        indexed = {}
+        occurrences = {}
+        for entry in results_data:
+            base_key = self._row_key(entry)
+            occurrence = occurrences.get(base_key, 0)
+            occurrences[base_key] = occurrence + 1
+            indexed[base_key + (occurrence,)] = entry
+        return indexed
+
+    def _row_key(self, entry: Dict) -> tuple:
+        """Build the (channel, frequency, gain) key of a row"""
+        key = tuple(self._first_value(entry, names) for names in self.ROW_KEY_FIELDS.values())
+        if any(value is not None for value in key):
+            return key
+
+        channels = sorted({int(match.group(1)) for match in map(self.CHANNEL_COLUMN_PATTERN.match, entry)
+                           if match})
+        if not channels:
+            return key
+        if len(channels) == 1:
+            channel = channels[0]
+            return (channel, entry.get(f'frequency_{channel}'), entry.get(f'gain_{channel}'))
+        return (tuple(channels),
+                tuple(entry.get(f'frequency_{channel}') for channel in channels),
+                tuple(entry.get(f'gain_{channel}') for channel in channels))
+
+    @staticmethod
+    def _is_positional(key: tuple) -> bool:
+        """Whether a row key has no (channel, frequency, gain) part, i.e. only its position"""
+        return all(value is None for value in key[:-1])
+
+    @staticmethod
+    def _first_value(entry: Dict, names: List[str]) -> Any:
+        for name in names:
+            if entry.get(name) is not None:
+                return entry[name]
+        return None
+
+    def _format_key(self, key: tuple) -> str:
+        if self._is_positional(key):
+            return f"row #{key[-1] + 1} (by position)"
+        parts = [f"{field}={value}" for field, value in zip(self.ROW_KEY_FIELDS, key) if value is not None]
+        if key[-1]:
+            parts.append(f"#{key[-1] + 1}")
+        return ', '.join(parts)
+
+    def _compare_row(self, key: tuple, row_a: Dict, row_b: Dict) -> Dict[str, Any]:
+        """Compute peak deltas and trace RMS difference for a pair of rows"""
+        amplitude_delta = self._delta(row_a.get('peak_amplitude'), row_b.get('peak_amplitude'))
+        frequency_delta = self._delta(row_a.get('peak_frequency'), row_b.get('peak_frequency'))
+        trace_rms = self._trace_rms(row_a.get('amplitudes'), row_b.get('amplitudes'))
+
+        regression = (
+            (amplitude_delta is not None and abs(amplitude_delta) > self.amplitude_threshold)
+            or (frequency_delta is not None and abs(frequency_delta) > self.frequency_threshold)
+            or (trace_rms is not None and trace_rms > self.trace_threshold)
+        )
+
+        return {
+            'key': self._format_key(key),
+            'peak_amplitude_a': row_a.get('peak_amplitude'),
+            'peak_amplitude_b': row_b.get('peak_amplitude'),
+            'peak_amplitude_delta': amplitude_delta,
+            'peak_frequency_a': row_a.get('peak_frequency'),
+            'peak_frequency_b': row_b.get('peak_frequency'),
+            'peak_frequency_delta': frequency_delta,
+            'trace_rms': trace_rms,
+            'regression': regression,
+            'by_position': self._is_positional(key),
+        }
+
+    @staticmethod
+    def _delta(value_a: Any, value_b: Any) -> Optional[float]:
+        if isinstance(value_a, (int, float)) and isinstance(value_b, (int, float)):
+            return value_b - value_a
+        return None
+
+    @staticmethod
+    def _trace_rms(trace_a: Any, trace_b: Any) -> Optional[float]:
+        """RMS difference between two amplitude traces over their common length"""
+        if not isinstance(trace_a, list) or not isinstance(trace_b, list):
+            return None
+        length = min(len(trace_a), len(trace_b))
+        if length == 0:
+            return None
+        if numpy is not None:
+            diff = numpy.asarray(trace_b[:length], dtype=float) - numpy.asarray(trace_a[:length], dtype=float)
+            return float(numpy.sqrt(numpy.mean(diff * diff)))
+        total = math.fsum((b - a) ** 2 for a, b in zip(trace_a[:length], trace_b[:length]))
+        return math.sqrt(total / length)
+
+
+class ComparisonReportGenerator:
+    """Generator for HTML session comparison reports"""
+
+    def generate_report(self, comparison: Dict[str, Any], output_file: Path) -> None:
+        """Generate HTML report comparing two sessions"""
+        sections = [self._generate_test_section(test) for test in comparison['tests']]
+
+        missing = []
+        if comparison['only_in_a']:
+            missing.append(f"<p><strong>Only in {comparison['session_a']}:</strong> "
+                           f"{', '.join(comparison['only_in_a'])}</p>")
+        if comparison['only_in_b']:
+            missing.append(f"<p><strong>Only in {comparison['session_b']}:</strong> "
+                           f"{', '.join(comparison['only_in_b'])}</p>")
+
+        total_regressions = sum(test['regressions'] for test in comparison['tests'])
+
+        html_content = self._create_html_template().format(
+            session_a=comparison['session_a'],
+            session_b=comparison['session_b'],
+            amplitude_threshold=comparison['amplitude_threshold'],
+            frequency_threshold=comparison['frequency_threshold'] / 1e6,
+            trace_threshold=comparison['trace_threshold'],
+            test_count=len(comparison['tests']),
+            total_regressions=total_regressions,
+            missing_tests='\n'.join(missing),
+            test_sections='\n'.join(sections) or "<p>No common tests found</p>",
+            generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+        with ReportWriter(output_file) as writer:
+            writer.write(html_content)
+
+        print(f"Generated comparison report: {output_file}")
+
+    def _generate_test_section(self, test: Dict[str, Any]) -> str:
+        """Generate the comparison table for a single test"""
+        status_class = 'regression' if test['status_regression'] else ''
+        html = f"""
+        <div class='test-comparison'>
+            <h2>{test['test_name']}</h2>
+            <p class='{status_class}'><strong>Status:</strong> {test['status_a']} &rarr; {test['status_b']}
+               &nbsp; <strong>Regressions:</strong> {test['regressions']} of {len(test['rows'])} rows</p>
+        """
+        if test['only_in_a'] or test['only_in_b']:
+            html += f"<p><strong>Unmatched rows:</strong> {len(test['only_in_a'])} only in A, {len(test['only_in_b'])} only in B</p>\n"
+        if test['positional_matches']:
+            html += (f"<p class='warning'><strong>Matched by position:</strong> {test['positional_matches']} rows "
+                     f"have no channel, frequency or gain and were paired by their order in the results</p>\n")
+
+        if not test['rows']:
+            return html + "<p>No matching rows</p>\n</div>\n"
+
+        rows = []
+        for i, row in enumerate(test['rows']):
+            css_class = 'regression' if row['regression'] else ('even' if i % 2 == 0 else 'odd')
+            rows.append(
+                f"<tr class='{css_class}'><td>{row['key']}</td>"
+                f"<td class='numeric'>{self._format_number(row['peak_amplitude_a'], '{:.2f}')}</td>"
+                f"<td class='numeric'>{self._format_number(row['peak_amplitude_b'], '{:.2f}')}</td>"
+                f"<td class='numeric'>{self._format_number(row['peak_amplitude_delta'], '{:+.2f}')}</td>"
+                f"<td class='numeric'>{self._format_number(row['peak_frequency_a'], '{:.6f}', 1e9)}</td>"
+                f"<td class='numeric'>{self._format_number(row['peak_frequency_b'], '{:.6f}', 1e9)}</td>"
+                f"<td class='numeric'>{self._format_number(row['peak_frequency_delta'], '{:+.3f}', 1e6)}</td>"
+                f"<td class='numeric'>{self._format_number(row['trace_rms'], '{:.3f}')}</td></tr>"
+            )
+
+        html += """
+            <table>
+                <thead>
+                    <tr><th>Row</th><th>Peak Amplitude A (dBm)</th><th>Peak Amplitude B (dBm)</th><th>&Delta; Amplitude (dB)</th>
+                        <th>Peak Frequency A (GHz)</th><th>Peak Frequency B (GHz)</th><th>&Delta; Frequency (MHz)</th><th>Trace RMS (dB)</th></tr>
+                </thead>
+                <tbody>
+"""
+        html += '\n'.join(rows)
+        html += """
+                </tbody>
+            </table>
+        </div>
+"""
+        return html
+
+    @staticmethod
+    def _format_number(value: Optional[float], fmt: str, scale: float = 1.0) -> str:
+        if value is None:
+            return 'N/A'
+        return fmt.format(value / scale)
+
+    def _create_html_template(self) -> str:
+        """Create the HTML template"""
+        return """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Test Reports Index - {test_session}</title>
+    <title>Session Comparison: {session_a} vs {session_b}</title>
     <style>
         body {{
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
+            line-height: 1.6;
         }}
         .container {{
-            max-width: 1000px;
+            max-width: 1400px;
             margin: 0 auto;
             background: white;
             padding: 30px;
@@ -733,83 +1333,701 @@ def _generate_index_page(report_files: List[Path], index_file: Path, test_sessio
             border-bottom: 3px solid #3498db;
             padding-bottom: 10px;
         }}
-        .test-run {{
-            margin: 30px 0;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            overflow: hidden;
+        h2 {{
+            color: #34495e;
+            margin-top: 40px;
+        }}
+        .summary {{
+            background-color: #e9ecef;
+            padding: 15px;
+            border-radius: 5px;
         }}
-        .test-run-header {{
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            font-size: 13px;
+        }}
+        th, td {{
+            padding: 6px;
+            text-align: left;
+            border-bottom: 1px solid #ddd;
+        }}
+        th {{
             background-color: #3498db;
             color: white;
-            padding: 15px;
-            font-weight: bold;
-            font-size: 18px;
+            font-size: 12px;
+        }}
+        .numeric {{
+            text-align: right;
+            font-family: 'Courier New', monospace;
+            white-space: nowrap;
+        }}
+        tr.odd {{
+            background-color: #f8f9fa;
+        }}
+        p.warning {{
+            background-color: #fff3cd;
+            color: #856404;
+        }}
+        tr.regression, p.regression {{
+            background-color: #f8d7da;
+            color: #721c24;
+        }}
+        .footer {{
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid #ddd;
+            color: #666;
+            font-size: 12px;
+            text-align: center;
         }}
-        .report-list {{
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Session Comparison: {session_a} &rarr; {session_b}</h1>
+        <div class="summary">
+            <p><strong>Common tests:</strong> {test_count} &nbsp; <strong>Regressions:</strong> {total_regressions}</p>
+            <p><strong>Thresholds:</strong> peak amplitude &gt; {amplitude_threshold} dB, peak frequency &gt; {frequency_threshold} MHz, trace RMS &gt; {trace_threshold} dB</p>
+            {missing_tests}
+        </div>
+        {test_sections}
+        <div class="footer">
+            <p>Report generated on {generation_time}</p>
+        </div>
+    </div>
+</body>
+</html>"""
+
+
+# Rough peak memory per input byte while a folder is parsed and rendered.
+# JSON results roughly triple once loaded and formatted into table rows.
+# Screenshots are streamed one at a time, so only the largest counts: it is
+# held raw, as a base64 string and as the encoded chunk passed to the writer.
+JSON_MEMORY_FACTOR = 3
+SCREENSHOT_MEMORY_FACTOR = 4
+FOLDER_MEMORY_OVERHEAD = 1024 * 1024
+
+
+def estimate_memory(manifest: FolderManifest) -> int:
+    """Estimate the peak memory in bytes needed to generate the report for a folder"""
+    estimate = FOLDER_MEMORY_OVERHEAD
+    largest_screenshot = 0
+    for file in manifest.folder.iterdir():
+        if file.suffix == '.png':
+            largest_screenshot = max(largest_screenshot, file.stat().st_size)
+        elif file.suffix == '.json':
+            estimate += file.stat().st_size * JSON_MEMORY_FACTOR
+    return estimate + largest_screenshot * SCREENSHOT_MEMORY_FACTOR
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as '512M' or '2G' into bytes"""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    value = value.strip().upper().rstrip('B')
+    try:
+        if value and value[-1] in units:
+            size = int(float(value[:-1]) * units[value[-1]])
+        else:
+            size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r} (expected e.g. 512M or 2G)")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r} (must be greater than zero)")
+    return size
+
+
+def _format_size(size: float) -> str:
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def get_peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes, if the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class BatchScheduler:
+    """Run the report pipeline on a thread pool within a memory budget
+
+    Folders are ordered by estimated cost, largest first, so the slowest ones
+    do not end up at the tail of the run. A folder is only started when its
+    estimate fits in what is left of the budget; otherwise the next smaller
+    folder that fits is started, or the scheduler waits for running work to
+    finish. A folder larger than the whole budget runs on its own.
+    """
+
+    def __init__(self, max_memory: Optional[int] = None, max_workers: int = 1):
+        self.max_memory = max_memory
+        self.max_workers = max_workers
+        self.stats = {}
+
+    def run(self, manifests: Iterable[FolderManifest], output_dir: Path,
+            report_generator: Optional['HTMLReportGenerator'] = None) -> Iterator[ReportResult]:
+        """Generate reports for the given manifests, yielding results as they complete"""
+        report_generator = report_generator or HTMLReportGenerator()
+        start_time = time.monotonic()
+        pending = sorted(((estimate_memory(manifest), manifest) for manifest in manifests),
+                         key=lambda item: item[0], reverse=True)
+        input_bytes = sum(file.stat().st_size for cost, manifest in pending
+                          for file in manifest.folder.iterdir() if file.is_file())
+        in_flight = {}
+        reserved = 0
+        peak_reserved = 0
+        completed = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or in_flight:
+                # Start as much pending work as the worker count and budget allow
+                while pending and len(in_flight) < self.max_workers:
+                    index = self._next_fitting(pending, reserved, bool(in_flight))
+                    if index is None:
+                        break
+                    cost, manifest = pending.pop(index)
+                    future = executor.submit(process_folder, manifest, output_dir, report_generator)
+                    in_flight[future] = cost
+                    reserved += cost
+                    peak_reserved = max(peak_reserved, reserved)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    reserved -= in_flight.pop(future)
+                    completed += 1
+                    yield future.result()
+
+        self.stats = {
+            'folders': completed,
+            'input_bytes': input_bytes,
+            'peak_reserved_bytes': peak_reserved,
+            'elapsed': time.monotonic() - start_time,
+            'peak_rss_bytes': get_peak_rss(),
+        }
+
+    def _next_fitting(self, pending: List[tuple], reserved: int, busy: bool) -> Optional[int]:
+        """Index of the largest pending folder that fits in the remaining budget"""
+        if self.max_memory is None or not busy:
+            return 0
+        for index, (cost, manifest) in enumerate(pending):
+            if reserved + cost <= self.max_memory:
+                return index
+        return None
+
+    def summary(self) -> str:
+        """Human readable summary of the last run"""
+        stats = self.stats
+        if not stats:
+            return "No batch run completed yet"
+        elapsed = max(stats['elapsed'], 1e-9)
+        lines = [
+            f"Processed {stats['folders']} folders in {stats['elapsed']:.2f}s "
+            f"({stats['folders'] / elapsed:.1f} folders/s, "
+            f"{_format_size(stats['input_bytes'] / elapsed)}/s of input files)",
+            f"Peak reserved memory: {_format_size(stats['peak_reserved_bytes'])}"
+            + (f" of {_format_size(self.max_memory)} budget" if self.max_memory else ""),
+        ]
+        if stats['peak_rss_bytes'] is not None:
+            lines.append(f"Peak RSS: {_format_size(stats['peak_rss_bytes'])}")
+        return '\n'.join(lines)
+
+
+_INDEX_PAGE_STYLE = """
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .container {
+            max-width: 1000px;
+            margin: 0 auto;
+            background: white;
+            padding: 30px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: #2c3e50;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 10px;
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+        }
+        th, td {
+            padding: 10px;
+            text-align: left;
+            border-bottom: 1px solid #e0e0e0;
+        }
+        th {
+            background-color: #3498db;
+            color: white;
+        }
+        .numeric {
+            text-align: right;
+        }
+        .passed {
+            color: #155724;
+        }
+        .failed {
+            color: #721c24;
+        }
+        .search input {
+            width: 100%;
+            padding: 10px;
+            font-size: 16px;
+            box-sizing: border-box;
+            border: 1px solid #ccc;
+            border-radius: 5px;
+        }
+        .report-list {
             list-style: none;
             padding: 0;
             margin: 0;
-        }}
-        .report-list li {{
+        }
+        .report-list li {
             margin: 0;
             padding: 15px;
             background-color: #f8f9fa;
             border-bottom: 1px solid #e0e0e0;
-        }}
-        .report-list li:last-child {{
+        }
+        .report-list li:last-child {
             border-bottom: none;
-        }}
-        .report-list a {{
+        }
+        .report-list a, td a {
             color: #2c3e50;
             text-decoration: none;
             font-weight: bold;
-        }}
-        .report-list a:hover {{
+        }
+        .report-list a:hover, td a:hover {
             color: #3498db;
-        }}
-        .footer {{
+        }
+        .status, .duration {
+            margin-left: 10px;
+            font-size: 13px;
+        }
+        .pagination {
+            text-align: center;
+        }
+        .footer {
             margin-top: 30px;
             text-align: center;
             color: #666;
             font-size: 12px;
-        }}
-    </style>
+        }
+"""
+
+_INDEX_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>{style}    </style>
 </head>
 <body>
     <div class="container">
-        <h1>Test Reports Index</h1>
-        <h2>Test Session: {test_session}</h2>
-        
-"""
-    
-    for test_run_name in sorted(test_runs.keys()):
-        reports = test_runs[test_run_name]
-        index_html += f"""
-        <div class="test-run">
-            <div class="test-run-header">{test_run_name}</div>
-            <ul class="report-list">
-"""
-        for report_file in sorted(reports):
-            test_name = report_file.stem.replace('_report', '')
-            relative_path = f"{test_run_name}/{report_file.name}"
-            index_html += f'                <li><a href="{relative_path}">{test_name}</a></li>\n'
-        
-        index_html += """            </ul>
-        </div>
-"""
-    
-    index_html += f"""        
+        <h1>{heading}</h1>
+        <h2>{subheading}</h2>
+        {content}
         <div class="footer">
-            <p>Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-            <p>{len(report_files)} test reports available across {len(test_runs)} test runs</p>
+            <p>Generated on {generation_time}</p>
+            {footer}
         </div>
     </div>
 </body>
 </html>"""
+
+_SEARCH_SCRIPT = """<script>
+    // Client-side search over the prebuilt index in search_index.js
+    (function() {
+        var input = document.getElementById('search');
+        var list = document.getElementById('search-results');
+        var entries = (window.SEARCH_INDEX || {entries: []}).entries.map(function(entry) {
+            return {entry: entry, text: entry.slice(0, 4).join(' ').toLowerCase()};
+        });
+        input.addEventListener('input', function() {
+            var terms = input.value.toLowerCase().split(/\\s+/).filter(Boolean);
+            list.innerHTML = '';
+            if (!terms.length) {
+                return;
+            }
+            var shown = 0;
+            for (var i = 0; i < entries.length && shown < 50; i++) {
+                var text = entries[i].text;
+                if (!terms.every(function(term) { return text.indexOf(term) !== -1; })) {
+                    continue;
+                }
+                var entry = entries[i].entry;
+                var item = document.createElement('li');
+                var link = document.createElement('a');
+                link.href = entry[4];
+                link.textContent = entry[0];
+                item.appendChild(link);
+                item.appendChild(document.createTextNode(' ' + entry[1] + ' ' + entry[2] + ' ' + entry[3]));
+                list.appendChild(item);
+                shown++;
+            }
+        });
+    })();
+</script>"""
+
+
+class IndexGenerator:
+    """Generator for the sharded report index
+
+    Writes one page per test session, a paginated top-level summary with
+    pass/fail counts per session, and a prebuilt search index used by the
+    summary page's client-side search.
+    """
+
+    SESSIONS_PER_PAGE = 100
+
+    # Column order of the entries in search_index.js
+    SEARCH_INDEX_FIELDS = ['test', 'session', 'status', 'duration', 'href']
+
+    def __init__(self, compression: Optional[List[str]] = None, compress_only: bool = False):
+        self.compression = compression
+        self.compress_only = compress_only
+
+    def generate(self, report_results: Iterable[ReportResult], output_dir: Path, test_session: str) -> Path:
+        """Write all index pages and return the top-level index file"""
+        sessions = {}
+        for result in report_results:
+            if result.error is None:
+                sessions.setdefault(result.output_file.parent.name, []).append(result)
+
+        session_names = sorted(sessions)
+        generation_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        search_index = []
+        session_rows = []
+
+        for session_name in session_names:
+            results = sorted(sessions[session_name], key=lambda result: result.output_file.name)
+            counts = {'PASSED': 0, 'FAILED': 0, 'OTHER': 0}
+            for result in results:
+                status = self._get_status(result)
+                counts[status if status in counts else 'OTHER'] += 1
+                search_index.append([self._get_test_name(result), session_name, status,
+                                     (result.status or {}).get('duration', ''),
+                                     f"{session_name}/{result.output_file.name}"])
+
+            self._write_session_page(session_name, results, output_dir / session_name / "index.html",
+                                     generation_time)
+            session_rows.append(
+                f"<tr><td><a href='{session_name}/index.html'>{session_name}</a></td>"
+                f"<td class='numeric'>{len(results)}</td>"
+                f"<td class='numeric passed'>{counts['PASSED']}</td>"
+                f"<td class='numeric failed'>{counts['FAILED']}</td>"
+                f"<td class='numeric'>{counts['OTHER']}</td></tr>"
+            )
+
+        self._write_search_index(search_index, output_dir / "search_index.js")
+
+        index_file = None
+        page_count = max(1, -(-len(session_rows) // self.SESSIONS_PER_PAGE))
+        report_count = len(search_index)
+        for page in range(page_count):
+            rows = session_rows[page * self.SESSIONS_PER_PAGE:(page + 1) * self.SESSIONS_PER_PAGE]
+            html_content = _INDEX_PAGE_TEMPLATE.format(
+                title=f"Test Reports Index - {test_session}",
+                heading="Test Reports Index",
+                subheading=f"Test Session: {test_session}",
+                style=_INDEX_PAGE_STYLE,
+                content=self._summary_content(rows, page, page_count),
+                footer=f"<p>{report_count} test reports available across {len(session_names)} test runs</p>",
+                generation_time=generation_time,
+            )
+            written_file = self._write(output_dir / self._summary_page_name(page), html_content)
+            if page == 0:
+                index_file = written_file
+
+        return index_file
+
+    @staticmethod
+    def _get_status(result: ReportResult) -> str:
+        return (result.status or {}).get('status', 'UNKNOWN')
+
+    @staticmethod
+    def _get_test_name(result: ReportResult) -> str:
+        return result.manifest.folder.name
+
+    @staticmethod
+    def _summary_page_name(page: int) -> str:
+        return "index.html" if page == 0 else f"index_{page + 1}.html"
+
+    def _summary_content(self, rows: List[str], page: int, page_count: int) -> str:
+        """Build the search box, session table and page navigation for one summary page"""
+        parts = [
+            "<div class='search'>",
+            "<input type='search' id='search' placeholder='Search tests by name, session or status...' autocomplete='off'>",
+            "<ul class='report-list' id='search-results'></ul>",
+            "</div>",
+            "<table>",
+            "<thead><tr><th>Test Run</th><th>Reports</th><th>Passed</th><th>Failed</th><th>Other</th></tr></thead>",
+            "<tbody>",
+        ]
+        parts.extend(rows)
+        parts.append("</tbody>\n</table>")
+
+        if page_count > 1:
+            links = []
+            for other in range(page_count):
+                if other == page:
+                    links.append(f"<strong>{other + 1}</strong>")
+                else:
+                    links.append(f"<a href='{self._summary_page_name(other)}'>{other + 1}</a>")
+            parts.append(f"<div class='pagination'>Page: {' '.join(links)}</div>")
+
+        parts.append("<script src='search_index.js'></script>")
+        parts.append(_SEARCH_SCRIPT)
+        return '\n'.join(parts)
+
+    def _write_session_page(self, session_name: str, results: List[ReportResult], index_file: Path,
+                            generation_time: str) -> None:
+        """Write the page listing every report of one test session"""
+        items = []
+        for result in results:
+            status = self._get_status(result)
+            status_class = 'passed' if status == 'PASSED' else 'failed' if status == 'FAILED' else ''
+            duration = (result.status or {}).get('duration', 'N/A')
+            items.append(
+                f"<li><a href='{result.output_file.name}'>{self._get_test_name(result)}</a>"
+                f" <span class='status {status_class}'>{status}</span>"
+                f" <span class='duration'>{duration}</span></li>"
+            )
+
+        html_content = _INDEX_PAGE_TEMPLATE.format(
+            title=f"Test Run - {session_name}",
+            heading="Test Run",
+            subheading=session_name,
+            style=_INDEX_PAGE_STYLE,
+            content=("<p><a href='../index.html'>&larr; All test runs</a></p>\n"
+                     "<ul class='report-list'>\n" + '\n'.join(items) + "\n</ul>"),
+            footer=f"<p>{len(results)} test reports</p>",
+            generation_time=generation_time,
+        )
+        self._write(index_file, html_content)
+
+    def _write_search_index(self, search_index: List[List[str]], index_file: Path) -> None:
+        """Write the search index as a script so it also loads from file:// URLs"""
+        data = json.dumps({'fields': self.SEARCH_INDEX_FIELDS, 'entries': search_index},
+                          separators=(',', ':'))
+        self._write(index_file, f"window.SEARCH_INDEX={data};\n")
+
+    def _write(self, output_file: Path, content: str) -> Path:
+        """Write a page and return the first file actually written"""
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with ReportWriter(output_file, self.compression, self.compress_only) as writer:
+            writer.write(content)
+        return writer.paths[0]
+
+
+def compare_main(argv: List[str]) -> int:
+    """Entry point for the 'compare A B' mode"""
+    parser = argparse.ArgumentParser(
+        prog='test_report_generator.py compare',
+        description='Compare the results of two RS ATS test sessions'
+    )
+
+    parser.add_argument('session_a', type=Path, help='Baseline test session directory')
+    parser.add_argument('session_b', type=Path, help='Test session directory to compare against the baseline')
+
+    parser.add_argument(
+        '--output-dir', '-o',
+        type=Path,
+        default='processed_results',
+        help='Output directory for the comparison report (default: processed_results)'
+    )
+
+    parser.add_argument(
+        '--amplitude-threshold',
+        type=float,
+        default=1.0,
+        help='Flag rows whose peak amplitude changed by more than this many dB (default: 1.0)'
+    )
+
+    parser.add_argument(
+        '--frequency-threshold',
+        type=float,
+        default=1e6,
+        help='Flag rows whose peak frequency moved by more than this many Hz (default: 1e6)'
+    )
+
+    parser.add_argument(
+        '--trace-threshold',
+        type=float,
+        default=5.0,
+        help='Flag rows whose amplitude traces differ by more than this many dB RMS (default: 5.0)'
+    )
+
+    args = parser.parse_args(argv)
+
+    session_a = args.session_a.resolve()
+    session_b = args.session_b.resolve()
+    for session in (session_a, session_b):
+        if not session.exists():
+            print(f"Error: Input directory {session} does not exist")
+            return 1
+
+    output_dir = args.output_dir.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    comparator = SessionComparator(session_a, session_b, args.amplitude_threshold,
+                                   args.frequency_threshold, args.trace_threshold)
+    comparison = comparator.compare()
+
+    output_file = output_dir / f"compare_{session_a.name}_vs_{session_b.name}.html"
+    ComparisonReportGenerator().generate_report(comparison, output_file)
+
+    for test in comparison['tests']:
+        for warning in test['warnings']:
+            print(f"Warning: {test['test_name']}: {warning}")
+
+    total_regressions = sum(test['regressions'] for test in comparison['tests'])
+    print(f"\nCompared {len(comparison['tests'])} tests: {total_regressions} regressed rows")
+    for test in comparison['tests']:
+        if test['regressions'] or test['status_regression']:
+            print(f"  {test['test_name']}: {test['status_a']} -> {test['status_b']}, "
+                  f"{test['regressions']} regressed rows")
+        if test['positional_matches']:
+            print(f"  {test['test_name']}: {test['positional_matches']} rows matched by position only")
+
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == 'compare':
+        return compare_main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description='Generate HTML reports from RS ATS test results',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Generate reports for a specific test results folder
+  python test_report_generator.py /path/to/output/setups_180925_091733
+  
+  # Generate reports with custom output directory
+  python test_report_generator.py /path/to/output/setups_180925_091733 --output-dir ./reports
+  
+  # Compare two runs of the same suite
+  python test_report_generator.py compare output/setups_220925_110558 output/setups_220925_110722
+        """
+    )
+    
+    parser.add_argument(
+        'input_dir',
+        type=Path,
+        nargs='?',
+        default=Path('output'),
+        help='Input directory containing test result folders (default: output)'
+    )
+    
+    parser.add_argument(
+        '--output-dir', '-o',
+        type=Path,
+        default='processed_results',
+        required=False,
+        help='Output directory for HTML reports (default: same as input)'
+    )
+    
+    parser.add_argument(
+        '--max-memory',
+        type=parse_size,
+        default=None,
+        help='Memory budget for concurrent report generation, e.g. 512M or 2G (default: unlimited)'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=None,
+        help='Number of folders processed concurrently within the memory budget '
+             '(default: number of CPUs with --max-memory, otherwise 1)'
+    )
+    
+    parser.add_argument(
+        '--compress',
+        action='append',
+        choices=sorted(COMPRESSION_SUFFIXES),
+        help='Also write compressed copies of each report (e.g. report.html.gz); '
+             'may be given more than once. zstd and br need the zstandard/brotli packages'
+    )
+    
+    parser.add_argument(
+        '--compress-only',
+        action='store_true',
+        help='Only write the compressed files, dropping the plain HTML (implies --compress gzip)'
+    )
+    
+    args = parser.parse_args(argv)
+    
+    compression = args.compress or []
+    if args.compress_only and not compression:
+        compression = ['gzip']
+    unavailable = [fmt for fmt in compression if fmt not in available_compressions()]
+    if unavailable:
+        print(f"Error: Compression format(s) not available: {', '.join(unavailable)}")
+        return 1
+    
+    input_dir = args.input_dir.resolve()
+    if not input_dir.exists():
+        print(f"Error: Input directory {input_dir} does not exist")
+        return 1
+    
+    # Set output directory
+    if args.output_dir:
+        output_dir = args.output_dir.resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        output_dir = input_dir
     
-    with open(index_file, 'w') as f:
-        f.write(index_html)
+    # Recursively find all subfolders containing *_results.json files
+    manifests = list(discover(input_dir))
+
+    if not manifests:
+        print(f"No result folders found in {input_dir}")
+        return 1
+
+    print(f"Found {len(manifests)} result folders")
+
+    # Generate reports for each result folder
+    report_generator = HTMLReportGenerator(compression, args.compress_only)
+    report_results = []
+    jobs = args.jobs
+    if jobs is None:
+        jobs = (os.cpu_count() or 1) if args.max_memory else 1
+    scheduler = BatchScheduler(args.max_memory, max(1, jobs))
+
+    for result in scheduler.run(manifests, output_dir, report_generator):
+        for warning in result.warnings:
+            print(f"Warning: {warning}")
+        if result.error is None:
+            print(f"Generated report: {', '.join(str(path) for path in result.written_files)}")
+        else:
+            print(f"Error processing {result.manifest.folder.name}: {result.error}")
+        report_results.append(result)
+
+    # Generate index page
+    index_file = write_index(report_results, output_dir, input_dir.name,
+                             compression, args.compress_only)
+    generated_count = sum(1 for result in report_results if result.error is None)
+
+    print(f"\n{scheduler.summary()}")
+    print(f"Generated {generated_count} test reports in {output_dir}")
+    print(f"Open {index_file} to view all reports")
+
+    return 0
 
 
 if __name__ == '__main__':